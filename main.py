@@ -1,13 +1,181 @@
 import sys
-import sympy
+import ast
+import functools
+import operator
+import re
+from fractions import Fraction
+import numpy as np
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QPlainTextEdit, QSplitter,
     QVBoxLayout, QWidget, QLabel, QDockWidget, QToolBar,
     QAction, QFileDialog, QMessageBox, QColorDialog,
     QScrollArea, QShortcut
 )
-from PyQt5.QtCore import Qt, QPoint, QRect
-from PyQt5.QtGui import QPainter, QPen, QColor, QImage, QKeySequence
+from PyQt5.QtCore import Qt, QPoint, QPointF, QRect, QRectF, QSizeF, QTimer
+from PyQt5.QtGui import QPainter, QPen, QColor, QImage, QImageWriter, QPixmap, QKeySequence, QTextCursor
+
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional. Without it the stroke helpers run as (slow) plain Python;
+    # that's acceptable since they only run on demand, never while drawing.
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+##############################
+# Math Evaluation
+##############################
+_ARITH_RE = re.compile(r'^[\d+\-*/%().\s]+$')
+# A line ending in '=' (e.g. "2+2="), capturing the expression before it
+_TRAILING_EQ = re.compile(r'([^\n]*)=\Z')
+
+_ARITH_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+@functools.lru_cache(maxsize=512)
+def _sympify_cached(expr):
+    # sympy is slow to import, so only pay for it once something needs it
+    import sympy
+    return sympy.sympify(expr)
+
+
+@functools.lru_cache(maxsize=512)
+def _parse_arith(expr):
+    return ast.parse(expr, mode='eval').body
+
+
+def _eval_arith_node(node):
+    """
+    Walks a parsed arithmetic expression using exact Fractions, so results
+    print the same way sympy would ("1/3", not "0.333...").
+    Raises ValueError for anything it can't handle, so the caller can fall
+    back to sympy.
+    """
+    if isinstance(node, ast.Constant) and type(node.value) is int:
+        return Fraction(node.value)
+    if isinstance(node, ast.BinOp) and type(node.op) in _ARITH_OPS:
+        left = _eval_arith_node(node.left)
+        right = _eval_arith_node(node.right)
+        if isinstance(node.op, ast.Pow) and right.denominator != 1:
+            raise ValueError("non-integer power")
+        return _ARITH_OPS[type(node.op)](left, right)
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _ARITH_OPS:
+        return _ARITH_OPS[type(node.op)](_eval_arith_node(node.operand))
+    raise ValueError("unsupported expression")
+
+
+def evaluateExpression(expr):
+    """
+    Evaluates a typed expression like '2+2'. Plain integer arithmetic is
+    handled without sympy; anything else (symbols, functions, decimals)
+    goes through a cached sympy.sympify.
+    """
+    if _ARITH_RE.match(expr):
+        try:
+            return _eval_arith_node(_parse_arith(expr))
+        except (ValueError, ZeroDivisionError, SyntaxError):
+            pass
+    return _sympify_cached(expr)
+
+
+##############################
+# Stroke Geometry
+##############################
+@njit(cache=True)
+def simplifyStroke(xy, epsilon):
+    """
+    Ramer-Douglas-Peucker simplification of an (N, 2) float32 point array.
+    Returns the points that deviate more than `epsilon` pixels from the
+    simplified polyline (endpoints are always kept).
+    """
+    n = xy.shape[0]
+    if n < 3:
+        return xy.copy()
+    keep = np.zeros(n, dtype=np.bool_)
+    keep[0] = True
+    keep[n - 1] = True
+
+    # Explicit stack of (start, end) index ranges instead of recursion
+    stack = np.empty((n, 2), dtype=np.int64)
+    stack[0, 0] = 0
+    stack[0, 1] = n - 1
+    top = 1
+    while top > 0:
+        top -= 1
+        start = stack[top, 0]
+        end = stack[top, 1]
+        if end - start < 2:
+            continue
+        x0, y0 = xy[start, 0], xy[start, 1]
+        dx, dy = xy[end, 0] - x0, xy[end, 1] - y0
+        norm = np.sqrt(dx * dx + dy * dy)
+        max_dist = -1.0
+        index = start
+        for i in range(start + 1, end):
+            px, py = xy[i, 0] - x0, xy[i, 1] - y0
+            if norm == 0.0:
+                dist = np.sqrt(px * px + py * py)
+            else:
+                dist = abs(dx * py - dy * px) / norm
+            if dist > max_dist:
+                max_dist = dist
+                index = i
+        if max_dist > epsilon:
+            keep[index] = True
+            stack[top, 0] = start
+            stack[top, 1] = index
+            stack[top + 1, 0] = index
+            stack[top + 1, 1] = end
+            top += 2
+    return xy[keep]
+
+
+@njit(cache=True)
+def resampleStroke(xy, count):
+    """
+    Resamples an (N, 2) float32 point array to `count` points spaced evenly
+    along its arc length, the usual first step before comparing strokes.
+    """
+    n = xy.shape[0]
+    if n == 0 or count == 0:
+        return np.empty((0, 2), dtype=np.float32)
+    out = np.empty((count, 2), dtype=np.float32)
+    if n == 1 or count == 1:
+        for j in range(count):
+            out[j, 0] = xy[0, 0]
+            out[j, 1] = xy[0, 1]
+        return out
+
+    cumulative = np.zeros(n, dtype=np.float64)
+    for i in range(1, n):
+        dx = xy[i, 0] - xy[i - 1, 0]
+        dy = xy[i, 1] - xy[i - 1, 1]
+        cumulative[i] = cumulative[i - 1] + np.sqrt(dx * dx + dy * dy)
+    step = cumulative[n - 1] / (count - 1)
+
+    seg = 1
+    for j in range(count):
+        target = j * step
+        while seg < n - 1 and cumulative[seg] < target:
+            seg += 1
+        span = cumulative[seg] - cumulative[seg - 1]
+        t = 0.0 if span == 0.0 else (target - cumulative[seg - 1]) / span
+        t = min(max(t, 0.0), 1.0)
+        out[j, 0] = xy[seg - 1, 0] + t * (xy[seg, 0] - xy[seg - 1, 0])
+        out[j, 1] = xy[seg - 1, 1] + t * (xy[seg, 1] - xy[seg - 1, 1])
+    return out
+
 
 ##############################
 # Canvas for Drawing
@@ -21,10 +189,18 @@ class CanvasWidget(QWidget):
     def __init__(self, width=2000, height=2000, parent=None):
         super().__init__(parent)
         self.setFixedSize(width, height)
-
-        # QImage for drawing
-        self.image = QImage(width, height, QImage.Format_ARGB32)
+        # paintEvent covers every pixel it is asked for, so Qt needn't erase first
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+
+        # QImage for drawing. The canvas is always opaque, so skip the alpha channel;
+        # semi-transparent pens still blend correctly onto it. Like
+        # ARGB32_Premultiplied, RGB32 is one of Qt's native raster formats, so
+        # blending onto it needs no per-pixel format conversion.
+        # It starts small and grows (up to the widget size) as strokes reach its edge.
+        self.image = QImage(min(width, 512), min(height, 512), QImage.Format_RGB32)
         self.image.fill(Qt.white)
+        # On-screen copy of the image; kept in sync only where strokes land
+        self._pixmap = QPixmap.fromImage(self.image)
 
         # Tools
         self.current_tool = 'pen'
@@ -37,9 +213,20 @@ class CanvasWidget(QWidget):
         self.highlighter_width = 20
         self.eraser_width = 20
 
+        # One pen per tool, rebuilt only when its color changes
+        self._pens = {}
+        self.updatePens()
+
         # Drawing state
         self.drawing = False
         self.last_point = QPoint()
+        # Painter kept open on self.image for the duration of a stroke
+        self._painter = None
+
+        # Points of the current (or most recent) pen stroke, as a growable
+        # (N, 2) float32 array, for handwriting recognition
+        self._stroke_xy = np.empty((256, 2), dtype=np.float32)
+        self._stroke_len = 0
 
     def setTool(self, tool_name):
         self.current_tool = tool_name
@@ -48,55 +235,216 @@ class CanvasWidget(QWidget):
         self.pen_color = color
         # Highlighter is semi‐transparent version of the chosen color
         self.highlight_color = QColor(color.red(), color.green(), color.blue(), 128)
+        self.updatePens()
+
+    def updatePens(self):
+        self._pens['pen'] = QPen(self.pen_color, self.pen_width, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+        self._pens['highlighter'] = QPen(self.highlight_color, self.highlighter_width, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+        self._pens['eraser'] = QPen(self.eraser_color, self.eraser_width, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+
+    def currentPen(self):
+        return self._pens[self.current_tool]
+
+    def beginStrokePainter(self):
+        self.endStrokePainter()
+        self._painter = QPainter(self.image)
+        self._painter.setPen(self.currentPen())
+
+    def endStrokePainter(self):
+        if self._painter is not None:
+            self._painter.end()
+            self._painter = None
+
+    def addStrokePoint(self, point):
+        if self._stroke_len == len(self._stroke_xy):
+            grown = np.empty((2 * len(self._stroke_xy), 2), dtype=np.float32)
+            grown[:self._stroke_len] = self._stroke_xy
+            self._stroke_xy = grown
+        self._stroke_xy[self._stroke_len] = (point.x(), point.y())
+        self._stroke_len += 1
+
+    def toolWidth(self):
+        return self.currentPen().width()
+
+    def ensureImageCovers(self, point, margin):
+        """
+        Grows the drawing image so that it covers `point` plus `margin` pixels.
+        Each growth at least doubles the image, so resizes stay rare; the image
+        never grows past the widget itself.
+        """
+        old_w, old_h = self.image.width(), self.image.height()
+        needed_w = point.x() + margin + 1
+        needed_h = point.y() + margin + 1
+        if needed_w <= old_w and needed_h <= old_h:
+            return
+        new_w = max(old_w, min(max(old_w * 2, needed_w), self.width()))
+        new_h = max(old_h, min(max(old_h * 2, needed_h), self.height()))
+        if (new_w, new_h) == (old_w, old_h):
+            return
+
+        # An open stroke painter is bound to the old image; reopen it afterwards
+        stroking = self._painter is not None
+        self.endStrokePainter()
+
+        new_image = QImage(new_w, new_h, self.image.format())
+        new_image.fill(Qt.white)
+        painter = QPainter(new_image)
+        painter.drawImage(0, 0, self.image)
+        painter.end()
+
+        self.image = new_image
+        self._pixmap = QPixmap.fromImage(self.image)
+        if stroking:
+            self.beginStrokePainter()
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             self.drawing = True
             self.last_point = event.pos()
+            self.ensureImageCovers(event.pos(), self.toolWidth())
+            # One painter per stroke instead of one per mouse move;
+            # the eraser writes pixels directly and needs none
+            if self.current_tool != 'eraser':
+                self.beginStrokePainter()
+            self._stroke_len = 0
+            if self.current_tool == 'pen':
+                self.addStrokePoint(event.pos())
 
     def mouseMoveEvent(self, event):
         if (event.buttons() & Qt.LeftButton) and self.drawing:
-            painter = QPainter(self.image)
+            self.ensureImageCovers(event.pos(), self.toolWidth())
+            if self.current_tool == 'eraser':
+                self.eraseSegment(self.last_point, event.pos(), self.eraser_width / 2)
+            else:
+                self._painter.drawLine(self.last_point, event.pos())
             if self.current_tool == 'pen':
-                pen = QPen(self.pen_color, self.pen_width, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
-            elif self.current_tool == 'highlighter':
-                pen = QPen(self.highlight_color, self.highlighter_width, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
-            else:  # 'eraser'
-                pen = QPen(self.eraser_color, self.eraser_width, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+                self.addStrokePoint(event.pos())
 
-            painter.setPen(pen)
-            painter.drawLine(self.last_point, event.pos())
-            painter.end()
+            # Only the segment's bounding box, padded by half the pen width, has changed
+            w = self.toolWidth() // 2 + 1
+            dirty_rect = QRect(self.last_point, event.pos()).normalized().adjusted(-w, -w, w, w)
+            self.syncPixmap(dirty_rect)
 
             self.last_point = event.pos()
-            self.update()
+            self.update(dirty_rect)
+
+    def eraseSegment(self, p1, p2, radius):
+        """
+        Erases a round-capped segment from p1 to p2 by writing the eraser color
+        straight into the image's pixels through a numpy view, instead of
+        rasterizing a white line with QPainter.
+        """
+        ptr = self.image.bits()
+        ptr.setsize(self.image.sizeInBytes())
+        pixels = np.frombuffer(ptr, dtype=np.uint32).reshape(
+            self.image.height(), self.image.bytesPerLine() // 4)
+
+        # Work in pieces about one radius long, so each piece's bounding box
+        # stays ~3r square and the total work grows with length * radius,
+        # not with the (length squared) bounding box of the whole segment.
+        ax, ay = float(p1.x()), float(p1.y())
+        dx, dy = p2.x() - ax, p2.y() - ay
+        pieces = max(1, int(np.ceil(np.hypot(dx, dy) / max(radius, 1.0))))
+        for i in range(pieces):
+            t0, t1 = i / pieces, (i + 1) / pieces
+            self.eraseCapsule(pixels, ax + t0 * dx, ay + t0 * dy, ax + t1 * dx, ay + t1 * dy, radius)
+
+    def eraseCapsule(self, pixels, ax, ay, bx, by, radius):
+        """Sets every pixel within `radius` of the segment (ax, ay)-(bx, by) to the eraser color."""
+        img_h, img_w = self.image.height(), self.image.width()
+        x0 = max(int(min(ax, bx) - radius), 0)
+        x1 = min(int(max(ax, bx) + radius) + 1, img_w)
+        y0 = max(int(min(ay, by) - radius), 0)
+        y1 = min(int(max(ay, by) + radius) + 1, img_h)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        # Squared distance from each pixel in the bounding box to the segment
+        ys, xs = np.ogrid[y0:y1, x0:x1]
+        dx, dy = bx - ax, by - ay
+        length_sq = dx * dx + dy * dy
+        if length_sq:
+            t = np.clip(((xs - ax) * dx + (ys - ay) * dy) / length_sq, 0.0, 1.0)
+        else:
+            t = 0.0
+        dist_sq = (xs - ax - t * dx) ** 2 + (ys - ay - t * dy) ** 2
+
+        region = pixels[y0:y1, x0:x1]
+        region[dist_sq <= radius * radius] = self.eraser_color.rgb()
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.LeftButton:
             self.drawing = False
+            self.endStrokePainter()
             # Optionally, we could attempt to recognize if the user "wrote" a math expression
             # self.recognizeHandwritingExpression()
 
     def paintEvent(self, event):
         painter = QPainter(self)
+        r = event.rect()
+        # Anything past the (lazily grown) image is blank canvas
+        if not self._pixmap.rect().contains(r):
+            painter.fillRect(r, Qt.white)
+        r = r.intersected(self._pixmap.rect())
+        painter.drawPixmap(r, self._pixmap, r)
+
+    def syncPixmap(self, rect=None):
+        """Copies the given region (or all) of the drawing image to the on-screen pixmap."""
+        if rect is None:
+            rect = self.image.rect()
+        painter = QPainter(self._pixmap)
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.drawImage(rect, self.image, rect)
+        painter.end()
+
+    def canvasImage(self):
+        """
+        Returns the drawing at the full canvas (widget) size. The backing image
+        may still be smaller, since it grows lazily; pad it with white so saved
+        image files don't depend on how far the user has drawn.
+        """
+        if self.image.size() == self.size():
+            return self.image
+        full = QImage(self.width(), self.height(), self.image.format())
+        full.fill(Qt.white)
+        painter = QPainter(full)
         painter.drawImage(0, 0, self.image)
+        painter.end()
+        return full
 
     def clearCanvas(self):
         self.image.fill(Qt.white)
+        self._stroke_len = 0
+        self.syncPixmap()
         self.update()
 
     def saveCanvasAsImage(self, filename):
-        self.image.save(filename)
+        """
+        Writes the canvas to `filename`; the format follows the file extension.
+        PNGs are written with light zlib compression (Qt maps quality q to
+        level (100 - q) * 9 / 91), which saves several times faster than the
+        default level for a modest size increase. JPEGs get quality 90.
+        """
+        writer = QImageWriter(filename)
+        if filename.lower().endswith(('.jpg', '.jpeg')):
+            writer.setQuality(90)
+        else:
+            writer.setQuality(85)  # zlib level 1
+        return writer.write(self.canvasImage())
 
     def recognizeHandwritingExpression(self):
         """
         Placeholder for a real OCR/ML approach that would interpret
         drawn strokes as a text expression like '2+2=', then parse with sympy.
+        If the most recent stroke was drawn with the pen, its points are in
+        self._stroke_xy[:self._stroke_len] (otherwise that slice is empty).
         """
+        # Normalize the stroke only now, so drawing never pays for it
+        stroke = resampleStroke(simplifyStroke(self._stroke_xy[:self._stroke_len], 1.0), 32)
         # For real usage, you’d implement or call an OCR library here,
         # possibly Tesseract or a specialized handwriting model, to convert
-        # the drawn region into text. Then parse with sympy to get a result.
-        pass
+        # the drawn strokes into text. Then parse with sympy to get a result.
+        return stroke
 
 
 ##############################
@@ -134,8 +482,17 @@ class MainWindow(QMainWindow):
         """)
         self.notes_editor.setPlaceholderText("Type your notes here... (ends with '=' to auto-calc)")
 
-        # Auto-eval typed math in the notes
-        self.notes_editor.textChanged.connect(self.autoEvaluateTypedMath)
+        # Auto-eval typed math in the notes. Evaluation is debounced so a burst
+        # of keystrokes only triggers one evaluation once typing pauses.
+        self._eval_timer = QTimer(self)
+        self._eval_timer.setSingleShot(True)
+        self._eval_timer.setInterval(150)
+        self._eval_timer.timeout.connect(self.autoEvaluateTypedMath)
+        # Set while we rewrite the notes ourselves, so that edit isn't re-evaluated
+        self._internal_edit = False
+        # The last line as of the previous evaluation; if it hasn't changed, neither will the result
+        self._last_tail = ''
+        self.notes_editor.textChanged.connect(self.scheduleAutoEvaluate)
 
         notes_container = QWidget()
         notes_layout = QVBoxLayout()
@@ -167,6 +524,9 @@ class MainWindow(QMainWindow):
         self.main_toolbar.addAction(self.hamburger_action)
         self.addToolBar(self.main_toolbar)
 
+        # Color dialog, built on the first pick and reused after that
+        self._color_dialog = None
+
         # Set initial geometry
         self.resize(1200, 800)
 
@@ -238,30 +598,57 @@ class MainWindow(QMainWindow):
     ##########################
     # Math in Notes (Typed)
     ##########################
+    def scheduleAutoEvaluate(self):
+        """(Re)starts the debounce timer, unless the change came from our own rewrite."""
+        if self._internal_edit:
+            return
+        self._eval_timer.start()
+
     def autoEvaluateTypedMath(self):
         """
         If the last line in the notes ends with '=', attempt to parse the expression
-        before '=' with sympy, and replace it with "expr=result".
+        before '=' with sympy, and replace that line with "expr=result".
         Example: "2+2=" becomes "2+2=4".
+        Runs from a debounce timer rather than directly on textChanged.
         """
-        self.notes_editor.blockSignals(True)  # avoid recursion
-        text = self.notes_editor.toPlainText()
-        lines = text.split('\n')
-        if lines:
-            last_line = lines[-1]
-            if last_line.endswith('='):
-                expr = last_line[:-1].strip()
-                if expr:
-                    try:
-                        result = sympy.sympify(expr)
-                        lines[-1] = f"{expr}={result}"
-                        updated_text = '\n'.join(lines)
-                        self.notes_editor.setPlainText(updated_text)
-                        # Move cursor to end
-                        self.notes_editor.moveCursor(self.notes_editor.textCursor().End)
-                    except Exception:
-                        pass
-        self.notes_editor.blockSignals(False)
+        # Only the last line matters, so read just the last block rather than the
+        # whole text. Shift+Enter puts line separators (U+2028) inside a block, so
+        # the last line starts after the block's last separator.
+        block = self.notes_editor.document().lastBlock()
+        block_text = block.text()
+        line_start = block_text.rfind('\u2028') + 1
+        last_line = block_text[line_start:]
+        if last_line == self._last_tail:
+            return
+        self._last_tail = last_line
+        m = _TRAILING_EQ.match(last_line)
+        if m:
+            expr = m.group(1).strip()
+            if expr:
+                try:
+                    result = evaluateExpression(expr)
+                except Exception:
+                    return
+                # This runs a moment after the keystroke; only follow the result with
+                # the caret if the user is still at the end of the notes
+                at_end = self.notes_editor.textCursor().atEnd()
+                # Only rewrite the last line instead of resetting the whole document
+                self._internal_edit = True
+                try:
+                    cursor = QTextCursor(block)
+                    # Merge into the user's last edit, so a single undo takes back
+                    # both the '=' and the result (and doesn't trigger a re-evaluation)
+                    cursor.joinPreviousEditBlock()
+                    cursor.setPosition(block.position() + line_start)
+                    cursor.movePosition(QTextCursor.EndOfBlock, QTextCursor.KeepAnchor)
+                    self._last_tail = f"{expr}={result}"
+                    cursor.insertText(self._last_tail)
+                    cursor.endEditBlock()
+                    # Move cursor to end
+                    if at_end:
+                        self.notes_editor.moveCursor(QTextCursor.End)
+                finally:
+                    self._internal_edit = False
 
     ##########################
     # Zoom
@@ -284,14 +671,14 @@ class MainWindow(QMainWindow):
     # Color Picker
     ##########################
     def pickColor(self):
-        from PyQt5.QtWidgets import QColorDialog
-        color = QColorDialog.getColor(
-            initial=self.canvas.pen_color,
-            parent=self,
-            title="Select Pen/Highlight Color"
-        )
-        if color.isValid():
-            self.canvas.setPenColor(color)
+        if self._color_dialog is None:
+            self._color_dialog = QColorDialog(self)
+            self._color_dialog.setWindowTitle("Select Pen/Highlight Color")
+        self._color_dialog.setCurrentColor(self.canvas.pen_color)
+        if self._color_dialog.exec_() == QColorDialog.Accepted:
+            color = self._color_dialog.selectedColor()
+            if color.isValid():
+                self.canvas.setPenColor(color)
 
     ##########################
     # Save PDF (notes + drawing)
@@ -300,7 +687,7 @@ class MainWindow(QMainWindow):
         """
         Export both notes + drawing to a single PDF page.
         We'll:
-          1) Render the notes text to a QImage (or directly to QPainter),
+          1) Render the notes text directly to the QPainter (as vector text),
           2) Render the canvas QImage,
           3) Paint them onto a single page with QPdfWriter.
         """
@@ -321,57 +708,52 @@ class MainWindow(QMainWindow):
         # We'll put the NOTES text at the top half of the page,
         # and the drawing below it. Or side-by-side. Let's do top/bottom for simplicity.
 
-        # 1) Render notes into an image
-        #    We'll create a QPlainTextEdit "snapshot".
-        notes_img = self.grabWidgetAsImage(self.notes_editor, bgColor=QColor("#2b2b2b"))
-        # 2) Render canvas
-        canvas_img = self.canvas.image  # The raw QImage of the drawing
+        # Render canvas (the notes are drawn from their text document below)
+        canvas_img = self.canvas.image  # The raw QImage of the drawing (may be smaller than the canvas)
 
         # We'll define how big each section is on the PDF page
         page_width = pdf_writer.width()  # in pixels, based on DPI
         page_height = pdf_writer.height()
         half_page_height = page_height // 2
 
-        # Draw notes_img at top
-        scaled_notes = notes_img.scaled(page_width, half_page_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        painter.drawImage(0, 0, scaled_notes)
+        # Let the painter scale while drawing, instead of building scaled copies first
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+
+        # Draw notes at top.
+        # QPlainTextEdit's document layout doesn't paint through drawContents(),
+        # so draw a clone, which gets a regular QTextDocument layout. The notes
+        # are laid out at screen DPI, so scale the painter up to the PDF's DPI.
+        notes_doc = self.notes_editor.document().clone()
+        notes_doc.setDefaultFont(self.notes_editor.font())
+        scale = pdf_writer.logicalDpiY() / self.notes_editor.logicalDpiY()
+        notes_doc.setTextWidth(page_width / scale)
+        painter.save()
+        painter.scale(scale, scale)
+        notes_doc.drawContents(painter, QRectF(0, 0, page_width / scale, half_page_height / scale))
+        painter.restore()
 
         # Draw canvas_img at bottom
-        # We'll place it below the scaled_notes
+        # We'll place it below the notes
+        # Lay out the full canvas, then draw the (lazily grown) image into the
+        # matching part of it, so the page shows the drawing at its true scale
         canvas_target_rect = QRect(0, half_page_height, page_width, half_page_height)
-        scaled_canvas = canvas_img.scaled(canvas_target_rect.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        painter.drawImage(canvas_target_rect.topLeft(), scaled_canvas)
+        canvas_size = self.canvas.size().scaled(canvas_target_rect.size(), Qt.KeepAspectRatio)
+        page_canvas_rect = QRectF(QPointF(canvas_target_rect.topLeft()), QSizeF(canvas_size))
+        painter.fillRect(page_canvas_rect, Qt.white)
+        image_rect = QRectF(page_canvas_rect.topLeft(),
+                            QSizeF(page_canvas_rect.width() * canvas_img.width() / self.canvas.width(),
+                                   page_canvas_rect.height() * canvas_img.height() / self.canvas.height()))
+        painter.drawImage(image_rect, canvas_img, QRectF(canvas_img.rect()))
 
         painter.end()
         QMessageBox.information(self, "PDF Saved", f"Successfully saved PDF to:\n{filename}")
 
-    def grabWidgetAsImage(self, widget, bgColor=Qt.white):
-        """
-        Renders a given widget (like the notes editor) into a QImage, so we can
-        combine it in the PDF. We can set a background color if needed.
-        """
-        # Create an offscreen image matching the widget size
-        # We'll forcibly layout & render it.
-        w = widget.width()
-        h = widget.height()
-        if w < 2: w = 400
-        if h < 2: h = 300
-
-        image = QImage(w, h, QImage.Format_ARGB32)
-        image.fill(bgColor)
-
-        painter = QPainter(image)
-        widget.render(painter)
-        painter.end()
-
-        return image
-
     ##########################
     # Save Canvas as Image
     ##########################
     def saveCanvasAsImage(self):
         filename, _ = QFileDialog.getSaveFileName(self, "Save Canvas Image", "",
-                                                  "PNG Files (*.png);;All Files (*)")
+                                                  "PNG Files (*.png);;JPEG Files (*.jpg *.jpeg);;All Files (*)")
         if filename:
             self.canvas.saveCanvasAsImage(filename)
 
@@ -382,8 +764,17 @@ class MainWindow(QMainWindow):
         filename, _ = QFileDialog.getSaveFileName(self, "Save Notes", "",
                                                   "Text Files (*.txt);;All Files (*)")
         if filename:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(self.notes_editor.toPlainText())
+            # Write block by block rather than building the whole text in memory.
+            # Translate line separators (Shift+Enter) and non-breaking spaces the
+            # same way toPlainText() does.
+            block = self.notes_editor.document().firstBlock()
+            with open(filename, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                f.write(block.text().replace('\u2028', '\n').replace('\xa0', ' '))
+                block = block.next()
+                while block.isValid():
+                    f.write('\n')
+                    f.write(block.text().replace('\u2028', '\n').replace('\xa0', ' '))
+                    block = block.next()
 
 
 def main():